@@ -95,10 +95,13 @@ BOOK_IDS: dict[bible.Book, str] = MappingProxyType(
     },
 )
 
+_BOOK_BY_ID: dict[str, bible.Book] = {
+    book_id: book for book, book_id in BOOK_IDS.items()
+}
 
-def get_book_by_id(book_id: str) -> bible.Book:
-    for next_book, next_book_id in BOOK_IDS.items():
-        if book_id == next_book_id:
-            return next_book
 
-    raise bible.InvalidBookError
+def get_book_by_id(book_id: str) -> bible.Book:
+    try:
+        return _BOOK_BY_ID[book_id]
+    except KeyError:
+        raise bible.InvalidBookError from None
@@ -3,34 +3,44 @@
 from __future__ import annotations
 
 import os
+import re
+from collections import defaultdict
 from functools import lru_cache
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import NamedTuple
 
-from defusedxml import ElementTree
 from pythonbible import Book
+from pythonbible import InvalidBookError
 from pythonbible import InvalidVerseError
 from pythonbible import Version
 from pythonbible import get_book_chapter_verse
 from pythonbible import get_verse_id
+from pythonbible import get_verse_number
 
 from pythonbible_parser.bible_parser import BibleParser
 from pythonbible_parser.bible_parser import sort_paragraphs
 from pythonbible_parser.osis.constants import BOOK_IDS
-from pythonbible_parser.osis.osis_utilities import OSISID
+from pythonbible_parser.osis.constants import get_book_by_id
 from pythonbible_parser.osis.osis_utilities import get_element_tail
 from pythonbible_parser.osis.osis_utilities import get_element_text
 from pythonbible_parser.osis.osis_utilities import get_element_text_and_tail
 from pythonbible_parser.osis.osis_utilities import get_namespace
-from pythonbible_parser.osis.osis_utilities import parse_osis_id
-from pythonbible_parser.osis.osis_utilities import strip_namespace_from_tag
+from pythonbible_parser.osis.osis_utilities import get_qualified_tag
+from pythonbible_parser.osis.osis_utilities import iterparse_xml
+from pythonbible_parser.osis.osis_utilities import parse_xml_string
+from pythonbible_parser.osis.osis_utilities import serialize_xml
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Collection
+    from collections.abc import Iterable
 
 XML_FOLDER: str = Path(Path(os.path.realpath(__file__)).parent / "versions")
 
-XPATH_BOOK: str = ".//xmlns:div[@osisID='{}']"
-XPATH_BOOK_TITLE: str = f"{XPATH_BOOK}/xmlns:title"
-XPATH_VERSE: str = ".//xmlns:verse[@osisID='{}.{}.{}']"
-XPATH_VERSE_PARENT: str = f"{XPATH_VERSE}/.."
+WHITESPACE_PATTERN: re.Pattern[str] = re.compile(r"\s+")
 
 
 class OldOSISParser(BibleParser):
@@ -43,39 +53,59 @@ class OldOSISParser(BibleParser):
     def __init__(self: OldOSISParser, version: Version) -> None:
         """Initialize the OSIS parser.
 
-        Set the version, the element tree from the appropriate version XML file,
-        and the namespaces.
+        Set the version, the path to the appropriate version XML file, and the
+        namespaces. The XML file is streamed through the first time a book or
+        title is needed rather than parsed up front.
 
         :param version:
         """
         super().__init__(version)
 
-        self.tree: ElementTree = ElementTree.parse(
-            Path(XML_FOLDER / f"{self.version.value.lower()}.xml"),
-        )
+        self.xml_path: Path = Path(XML_FOLDER / f"{self.version.value.lower()}.xml")
         self.namespaces: dict[str, str] = {
-            "xmlns": get_namespace(self.tree.getroot().tag),
+            "xmlns": _get_root_namespace(self.xml_path),
         }
 
-    @lru_cache()
+        # Namespace-qualified tags, so lookups can compare tags directly instead
+        # of building and evaluating an XPath expression on every call.
+        self._div_tag: str = get_qualified_tag(self.namespaces["xmlns"], "div")
+        self._title_tag: str = get_qualified_tag(self.namespaces["xmlns"], "title")
+        self._verse_tag: str = get_qualified_tag(self.namespaces["xmlns"], "verse")
+        self._tag_handlers: dict[str, Callable[..., tuple[str, bool, int]]] = (
+            _get_tag_handlers(self.namespaces["xmlns"])
+        )
+
+        # The book div elements parsed so far, and an index of verse id to the
+        # paragraph element, book, and chapter of every verse in those books,
+        # so passages can be served without walking the tree on every lookup.
+        self._book_elements: dict[Book, Any] = {}
+        self._verse_index: dict[int, tuple[Any, Book, int]] = {}
+
+        # The full and short title of every book, and the serialized XML of every
+        # book that was not kept, recorded on the single streaming pass through
+        # the XML file, so books needed later are parsed from their own XML
+        # rather than by streaming through the whole file again.
+        self._book_titles: dict[Book, tuple[str, str]] = {}
+        self._book_sources: dict[Book, bytes] = {}
+        self._is_streamed: bool = False
+
+    @lru_cache(maxsize=1024)
     def get_book_title(self: OldOSISParser, book: Book) -> str:
         """Given a book, return the full title for that book from the XML file.
 
         :param book:
         :return: the full title string
         """
-        book_title_element = self._get_book_title_element(book)
-        return book_title_element.text or ""
+        return self._get_book_titles(book)[0]
 
-    @lru_cache()
+    @lru_cache(maxsize=1024)
     def get_short_book_title(self: OldOSISParser, book: Book) -> str:
         """Given a book, return the short title for that book from the XML file.
 
         :param book:
         :return: the short title string
         """
-        book_title_element = self._get_book_title_element(book)
-        return book_title_element.get("short") or ""
+        return self._get_book_titles(book)[1]
 
     def get_scripture_passage_text(
         self: OldOSISParser,
@@ -135,37 +165,92 @@ class OldOSISParser(BibleParser):
 
         return self._get_verse_text_memoized(verse_id, include_verse_number)
 
-    @lru_cache()
-    def _get_book_title_element(self: OldOSISParser, book: Book) -> Any:
-        xpath: str = XPATH_BOOK_TITLE.format(BOOK_IDS.get(book))
-        return self.tree.find(xpath, namespaces=self.namespaces)
+    def _get_book_titles(self: OldOSISParser, book: Book) -> tuple[str, str]:
+        self._stream_books(())
+        return self._book_titles.get(book, ("", ""))
+
+    def _load_books(self: OldOSISParser, books: Iterable[Book]) -> None:
+        books_to_load: set[Book] = {
+            book for book in books if book not in self._book_elements
+        }
+
+        if not books_to_load:
+            return
+
+        self._stream_books(books_to_load)
+
+        for book in books_to_load:
+            book_source: bytes | None = self._book_sources.pop(book, None)
+
+            if book_source is not None:
+                self._add_book_element(book, parse_xml_string(book_source))
+
+    def _stream_books(self: OldOSISParser, books: Collection[Book]) -> None:
+        # Stream through the XML file once, keeping the given book divs and
+        # serializing and clearing every other book as soon as it has been
+        # parsed, so only the books that are actually used stay in the tree.
+        if self._is_streamed:
+            return
 
-    @lru_cache()
+        with self.xml_path.open(mode="rb") as xml_file:
+            for _, element in iterparse_xml(xml_file, tag=self._div_tag):
+                if element.get("type") != "book":
+                    continue
+
+                try:
+                    book: Book = get_book_by_id(element.get("osisID"))
+                except InvalidBookError:
+                    element.clear()
+                    continue
+
+                self._book_titles[book] = _get_book_titles(element, self._title_tag)
+
+                if book in books:
+                    self._add_book_element(book, element)
+                    continue
+
+                self._book_sources[book] = serialize_xml(element)
+                element.clear()
+
+        self._is_streamed = True
+
+    def _add_book_element(self: OldOSISParser, book: Book, book_element: Any) -> None:
+        self._book_elements[book] = book_element
+        self._verse_index.update(
+            _get_verse_index(book_element, book, self._verse_tag),
+        )
+
+    @lru_cache(maxsize=1024)
     def _get_scripture_passage_text_memoized(
         self: OldOSISParser,
         verse_ids: tuple[int],
         include_verse_number: bool,
     ) -> dict[Book, dict[int, list[str]]]:
+        book_chapter_verses: dict[int, tuple[Book, int, int]] = {
+            verse_id: get_book_chapter_verse(verse_id) for verse_id in verse_ids
+        }
+        self._load_books(book for book, _, _ in book_chapter_verses.values())
         paragraphs: dict[Book, dict[int, list[str]]] = _get_paragraphs(
-            self.tree,
-            self.namespaces,
-            verse_ids,
+            self._verse_index,
+            self._tag_handlers,
+            book_chapter_verses,
             include_verse_number,
         )
 
         return sort_paragraphs(paragraphs)
 
-    @lru_cache()
+    @lru_cache(maxsize=1024)
     def _get_verse_text_memoized(
         self: OldOSISParser,
         verse_id: int,
         include_verse_number: bool,
     ) -> str:
-        verse_ids = (verse_id,)
+        book_chapter_verse: tuple[Book, int, int] = get_book_chapter_verse(verse_id)
+        self._load_books((book_chapter_verse[0],))
         paragraphs: dict[Book, dict[int, list[str]]] = _get_paragraphs(
-            self.tree,
-            self.namespaces,
-            verse_ids,
+            self._verse_index,
+            self._tag_handlers,
+            {verse_id: book_chapter_verse},
             include_verse_number,
         )
 
@@ -179,184 +264,312 @@ class OldOSISParser(BibleParser):
         return verse_text
 
 
+def _get_root_namespace(xml_path: Path) -> str:
+    # Only the root element's start tag is needed, so stop after the first event.
+    with xml_path.open(mode="rb") as xml_file:
+        _, root_element = next(iterparse_xml(xml_file, events=("start",)))
+        return get_namespace(root_element.tag)
+
+
+def _get_book_titles(book_element: Any, title_tag: str) -> tuple[str, str]:
+    for child_element in book_element:
+        if child_element.tag == title_tag:
+            return child_element.text or "", child_element.get("short") or ""
+
+    return "", ""
+
+
+def _get_verse_index(
+    book_element: Any,
+    book: Book,
+    verse_tag: str,
+) -> dict[int, tuple[Any, Book, int]]:
+    verse_index: dict[int, tuple[Any, Book, int]] = {}
+
+    for parent_element in book_element.iter():
+        for child_element in parent_element:
+            if child_element.tag != verse_tag:
+                continue
+
+            osis_id_str: str | None = child_element.get("osisID")
+
+            if not osis_id_str:
+                continue
+
+            chapter: str
+            verse: str
+            _, chapter, verse = osis_id_str.split(".")
+            verse_id: int = get_verse_id(book, int(chapter), int(verse))
+
+            if verse_id not in verse_index:
+                verse_index[verse_id] = (parent_element, book, int(chapter))
+
+    return verse_index
+
+
 def _get_paragraphs(
-    tree: ElementTree,
-    namespaces: dict[str, str],
-    verse_ids: tuple[int, ...],
+    verse_index: dict[int, tuple[Any, Book, int]],
+    tag_handlers: dict[str, Callable[..., tuple[str, bool, int]]],
+    book_chapter_verses: dict[int, tuple[Book, int, int]],
     include_verse_number: bool,
 ) -> dict[Book, dict[int, list[str]]]:
-    current_verse_id: int = verse_ids[0]
-    book: Book
-    chapter: int
-    verse: int
-    book, chapter, verse = get_book_chapter_verse(current_verse_id)
-    paragraph_element = tree.find(
-        XPATH_VERSE_PARENT.format(BOOK_IDS.get(book), chapter, verse),
-        namespaces,
+    # The book, chapter, and verse of each requested verse id, in sorted verse
+    # id order.
+    verse_ids: tuple[int, ...] = tuple(book_chapter_verses)
+    verse_ids_by_osis_id: dict[str, int] = _get_verse_ids_by_osis_id(
+        book_chapter_verses,
     )
-    paragraph: str
-    paragraph, current_verse_id = _get_paragraph_from_element(
-        paragraph_element,
-        verse_ids,
-        current_verse_id,
-        include_verse_number,
+    paragraph_dictionary: defaultdict[Book, defaultdict[int, list[str]]] = defaultdict(
+        lambda: defaultdict(list),
     )
-    current_verse_index: int = verse_ids.index(current_verse_id) + 1
-    paragraph_dictionary: dict[Book, dict[int, list[str]]] = {}
-
-    if current_verse_index < len(verse_ids):
-        paragraph_dictionary = _get_paragraphs(
-            tree,
-            namespaces,
-            verse_ids[current_verse_index:],
-            include_verse_number,
+    verse_positions: dict[int, int] = {
+        verse_id: position for position, verse_id in enumerate(verse_ids)
+    }
+    seen_paragraphs: set[int] = set()
+    current_verse_index: int = 0
+
+    while current_verse_index < len(verse_ids):
+        current_verse_id: int = verse_ids[current_verse_index]
+        verse_entry: tuple[Any, Book, int] | None = verse_index.get(current_verse_id)
+
+        if verse_entry is None:
+            raise InvalidVerseError(verse_id=current_verse_id)
+
+        paragraph_element: Any
+        book: Book
+        chapter: int
+        paragraph_element, book, chapter = verse_entry
+
+        if id(paragraph_element) in seen_paragraphs:
+            current_verse_index += 1
+            continue
+
+        seen_paragraphs.add(id(paragraph_element))
+        paragraph: str
+        paragraph, current_verse_id = _get_paragraph_from_element(
+            paragraph_element,
+            _ParagraphState(
+                tag_handlers,
+                verse_ids_by_osis_id,
+                include_verse_number,
+                skip_till_next_verse=False,
+                current_verse_id=current_verse_id,
+            ),
         )
 
-    book_dictionary: dict[int, list[str]] = paragraph_dictionary.get(book, {})
-    chapter_list: list[str] = book_dictionary.get(int(chapter), [])
-    chapter_list.insert(0, paragraph)
-    book_dictionary[int(chapter)] = chapter_list
-    paragraph_dictionary[book] = book_dictionary
+        paragraph_dictionary[book][chapter].append(paragraph)
+        current_verse_index = verse_positions[current_verse_id] + 1
 
-    return paragraph_dictionary
+    return {
+        book: dict(book_dictionary)
+        for book, book_dictionary in paragraph_dictionary.items()
+    }
+
+
+def _get_verse_ids_by_osis_id(
+    book_chapter_verses: dict[int, tuple[Book, int, int]],
+) -> dict[str, int]:
+    # Map the OSIS id string of each requested verse to its verse id, so verse
+    # tags can be matched on their osisID attribute without parsing it.
+    return {
+        f"{BOOK_IDS.get(book)}.{chapter}.{verse}": verse_id
+        for verse_id, (book, chapter, verse) in book_chapter_verses.items()
+    }
+
+
+class _ParagraphState(NamedTuple):
+    # The state threaded through the tag handlers while walking a paragraph.
+    tag_handlers: dict[str, Callable[..., tuple[str, bool, int]]]
+    verse_ids_by_osis_id: dict[str, int]
+    include_verse_number: bool
+    skip_till_next_verse: bool
+    current_verse_id: int
 
 
-@lru_cache()
 def _get_paragraph_from_element(
     paragraph_element: Any,
-    verse_ids: tuple[int, ...],
-    current_verse_id: int,
-    include_verse_number: bool,
+    state: _ParagraphState,
 ) -> tuple[str, int]:
-    new_current_verse_id: int = current_verse_id
-    paragraph: str = ""
-    skip_till_next_verse: bool = False
+    paragraph_parts: list[str] = []
     child_paragraph: str
+    skip_till_next_verse: bool
+    new_current_verse_id: int
 
-    for child_element in list(paragraph_element):
+    for child_element in paragraph_element:
         (
             child_paragraph,
             skip_till_next_verse,
             new_current_verse_id,
-        ) = _handle_child_element(
-            child_element,
-            verse_ids,
-            skip_till_next_verse,
-            new_current_verse_id,
-            include_verse_number,
+        ) = _handle_child_element(child_element, state)
+        state = state._replace(
+            skip_till_next_verse=skip_till_next_verse,
+            current_verse_id=new_current_verse_id,
         )
 
         if not child_paragraph:
             continue
 
-        if paragraph and not paragraph.endswith(" "):
-            paragraph += " "
+        if paragraph_parts and not paragraph_parts[-1].endswith(" "):
+            paragraph_parts.append(" ")
+
+        paragraph_parts.append(child_paragraph)
+
+    return clean_paragraph("".join(paragraph_parts)), state.current_verse_id
+
+
+def _get_tag_handlers(
+    namespace: str,
+) -> dict[str, Callable[..., tuple[str, bool, int]]]:
+    # Keyed by the namespace-qualified tag, so elements can be dispatched on
+    # their tag as-is without stripping the namespace first.
+    return {
+        get_qualified_tag(namespace, "verse"): _handle_verse_tag,
+        get_qualified_tag(namespace, "rdg"): _handle_rdg_tag,
+        get_qualified_tag(namespace, "w"): _handle_word_tag,
+        get_qualified_tag(namespace, "transChange"): _handle_word_tag,
+        get_qualified_tag(namespace, "q"): partial(
+            _handle_container_tag,
+            get_prefix=get_element_text_and_tail,
+        ),
+        get_qualified_tag(namespace, "seg"): partial(
+            _handle_container_tag,
+            get_suffix=get_element_tail,
+        ),
+        get_qualified_tag(namespace, "note"): partial(
+            _handle_note_tag,
+            rdg_tag=get_qualified_tag(namespace, "rdg"),
+        ),
+    }
 
-        paragraph += child_paragraph
 
-    return clean_paragraph(paragraph), new_current_verse_id
+def _handle_child_element(
+    child_element: Any,
+    state: _ParagraphState,
+) -> tuple[str, bool, int]:
+    tag_handler: Callable[..., tuple[str, bool, int]] = state.tag_handlers.get(
+        child_element.tag,
+        _handle_container_tag,
+    )
 
+    return tag_handler(child_element, state)
 
-@lru_cache()
-def _handle_child_element(
+
+def _handle_rdg_tag(
     child_element: Any,
-    verse_ids: tuple[int, ...],
-    skip_till_next_verse: bool,
-    current_verse_id: int,
-    include_verse_number: bool,
-    inside_note: bool = False,
+    state: _ParagraphState,
 ) -> tuple[str, bool, int]:
-    tag: str = strip_namespace_from_tag(child_element.tag)
+    if state.skip_till_next_verse:
+        return "", state.skip_till_next_verse, state.current_verse_id
 
-    if tag == "verse":
-        return _handle_verse_tag(
-            child_element,
-            verse_ids,
-            skip_till_next_verse,
-            current_verse_id,
-            include_verse_number,
-        )
+    return (
+        get_element_text(child_element),
+        state.skip_till_next_verse,
+        state.current_verse_id,
+    )
 
-    if skip_till_next_verse:
-        return "", skip_till_next_verse, current_verse_id
 
-    if tag == "rdg":
-        return (
-            get_element_text(child_element),
-            skip_till_next_verse,
-            current_verse_id,
-        )
+def _handle_word_tag(
+    child_element: Any,
+    state: _ParagraphState,
+) -> tuple[str, bool, int]:
+    if state.skip_till_next_verse:
+        return "", state.skip_till_next_verse, state.current_verse_id
 
-    # If we are inside a note tag, only allow the "rdg" text to be included
-    if inside_note:
-        return "", skip_till_next_verse, current_verse_id
+    return (
+        get_element_text_and_tail(child_element),
+        state.skip_till_next_verse,
+        state.current_verse_id,
+    )
 
-    if tag in {"w", "transChange"}:
-        return (
-            get_element_text_and_tail(child_element),
-            skip_till_next_verse,
-            current_verse_id,
-        )
 
-    paragraph: str = ""
+def _handle_note_tag(
+    child_element: Any,
+    state: _ParagraphState,
+    *,
+    rdg_tag: str,
+) -> tuple[str, bool, int]:
+    if state.skip_till_next_verse:
+        return "", state.skip_till_next_verse, state.current_verse_id
 
-    if tag == "q":
-        paragraph += get_element_text_and_tail(child_element)
+    return (
+        clean_paragraph(_walk_in_note(child_element, rdg_tag)),
+        state.skip_till_next_verse,
+        state.current_verse_id,
+    )
+
+
+def _walk_in_note(note_element: Any, rdg_tag: str) -> str:
+    # Inside a note tag, only the "rdg" text is included.
+    return "".join(
+        get_element_text(child_element)
+        for child_element in note_element
+        if child_element.tag == rdg_tag
+    )
 
-    new_current_verse_id: int = current_verse_id
 
-    for grandchild_element in list(child_element):
+def _handle_container_tag(
+    child_element: Any,
+    state: _ParagraphState,
+    *,
+    get_prefix: Callable[[Any], str] | None = None,
+    get_suffix: Callable[[Any], str] | None = None,
+) -> tuple[str, bool, int]:
+    if state.skip_till_next_verse:
+        return "", state.skip_till_next_verse, state.current_verse_id
+
+    paragraph_parts: list[str] = []
+    skip_till_next_verse: bool = state.skip_till_next_verse
+    new_current_verse_id: int = state.current_verse_id
+
+    if get_prefix is not None:
+        paragraph_parts.append(get_prefix(child_element))
+
+    for grandchild_element in child_element:
         (
             grandchild_paragraph,
             skip_till_next_verse,
             new_current_verse_id,
         ) = _handle_child_element(
             grandchild_element,
-            verse_ids,
-            skip_till_next_verse,
-            current_verse_id,
-            include_verse_number,
-            tag == "note",
+            state._replace(skip_till_next_verse=skip_till_next_verse),
         )
 
-        paragraph += grandchild_paragraph
+        if grandchild_paragraph:
+            paragraph_parts.append(grandchild_paragraph)
 
-    if tag == "seg":
-        paragraph += get_element_tail(child_element)
+    if get_suffix is not None:
+        paragraph_parts.append(get_suffix(child_element))
 
-    return clean_paragraph(paragraph), skip_till_next_verse, new_current_verse_id
+    return (
+        clean_paragraph("".join(paragraph_parts)),
+        skip_till_next_verse,
+        new_current_verse_id,
+    )
 
 
-@lru_cache()
 def _handle_verse_tag(
     child_element: Any,
-    verse_ids: tuple[int, ...],
-    skip_till_next_verse: bool,
-    current_verse_id: int,
-    include_verse_number: bool,
+    state: _ParagraphState,
 ) -> tuple[str, bool, int]:
     paragraph: str = ""
+    skip_till_next_verse: bool = state.skip_till_next_verse
+    current_verse_id: int = state.current_verse_id
     osis_id_str: str = child_element.get("osisID") or ".."
 
     if osis_id_str == "..":
         return paragraph, skip_till_next_verse, current_verse_id
 
-    osis_id: OSISID = parse_osis_id(osis_id_str)
-    verse_id: int = get_verse_id(
-        Book(osis_id.book.value),
-        int(osis_id.chapter),
-        int(osis_id.verse),
-    )
+    verse_id: int | None = state.verse_ids_by_osis_id.get(osis_id_str)
 
-    if verse_id in verse_ids:
+    if verse_id is not None:
         if skip_till_next_verse:
             skip_till_next_verse = False
 
             if current_verse_id is not None and verse_id > current_verse_id + 1:
                 paragraph += "... "
 
-        if include_verse_number:
-            paragraph += f"{osis_id.verse}. "
+        if state.include_verse_number:
+            paragraph += f"{get_verse_number(verse_id)}. "
 
         paragraph += get_element_text_and_tail(child_element)
 
@@ -366,7 +579,6 @@ def _handle_verse_tag(
     return paragraph, skip_till_next_verse, current_verse_id
 
 
-@lru_cache()
 def clean_paragraph(paragraph: str) -> str:
-    cleaned_paragraph: str = paragraph.replace("¶", "").replace("  ", " ")
+    cleaned_paragraph: str = WHITESPACE_PATTERN.sub(" ", paragraph.replace("¶", ""))
     return cleaned_paragraph.strip()
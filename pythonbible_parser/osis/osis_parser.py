@@ -9,19 +9,18 @@ from pathlib import Path
 from typing import Any
 
 import pythonbible as bible
-from defusedxml import ElementTree
 
 from pythonbible_parser.osis.constants import BOOK_IDS
 from pythonbible_parser.osis.osis_book_parser import OSISBookParser
 from pythonbible_parser.osis.osis_utilities import get_namespace
+from pythonbible_parser.osis.osis_utilities import get_qualified_tag
+from pythonbible_parser.osis.osis_utilities import parse_xml
 
 CURRENT_FOLDER: str = os.path.realpath(__file__)
 CURRENT_FOLDER_NAME: str = Path(CURRENT_FOLDER).parent
 INPUT_FOLDER: str = Path(CURRENT_FOLDER_NAME / "versions")
 OUTPUT_FOLDER: str = Path(CURRENT_FOLDER_NAME / "output")
 
-XPATH_BOOK: str = ".//xmlns:div[@osisID='{}']"
-
 
 class OSISParser:
     """Parse files containing scripture text in the OSIS format.
@@ -40,12 +39,13 @@ class OSISParser:
         """
         self.version: bible.Version = version
 
-        self.tree: ElementTree = ElementTree.parse(
+        self.tree: Any = parse_xml(
             Path(INPUT_FOLDER / f"{version.value.lower()}.xml"),
         )
         self.namespaces: dict[str, str] = {
             "xmlns": get_namespace(self.tree.getroot().tag),
         }
+        self._div_tag: str = get_qualified_tag(self.namespaces["xmlns"], "div")
 
         self.html: str = ""
         self.html_readers: str = ""
@@ -214,8 +214,13 @@ class OSISParser:
         _write_titles_file(version_folder, self.short_titles, self.long_titles)
 
     def _get_book_element(self: OSISParser, book: bible.Book) -> Any:
-        xpath: str = XPATH_BOOK.format(BOOK_IDS.get(book))
-        return self.tree.find(xpath, namespaces=self.namespaces)
+        book_id: str | None = BOOK_IDS.get(book)
+
+        for div_element in self.tree.iter(self._div_tag):
+            if div_element.get("osisID") == book_id:
+                return div_element
+
+        return None
 
 
 def _write_file(
@@ -1,37 +1,138 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import TYPE_CHECKING
 from typing import Any
 
+from defusedxml import ElementTree
+
 from pythonbible_parser.osis.constants import get_book_by_id
 
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+    from typing import BinaryIO
+
     from pythonbible import Book
 
 
-@lru_cache()
+def parse_xml(path: Path) -> Any:
+    """Parse the given XML file into an element tree.
+
+    Use lxml when it is installed, with entity resolution and network access
+    disabled; otherwise, fall back to defusedxml's ElementTree.
+
+    :param path:
+    :return: the parsed element tree
+    """
+    if etree is None:
+        return ElementTree.parse(path)
+
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    return etree.parse(str(path), parser)
+
+
+def iterparse_xml(
+    source: BinaryIO,
+    events: tuple[str, ...] = ("end",),
+    tag: str | None = None,
+) -> Iterator[tuple[str, Any]]:
+    """Incrementally parse the given XML file, yielding (event, element) pairs.
+
+    Use lxml when it is installed, with entity resolution and network access
+    disabled; otherwise, fall back to defusedxml's ElementTree.
+
+    :param source: the XML file, opened in binary mode
+    :param events:
+    :param tag: only yield events for elements with this tag, if given
+    :return: an iterator of (event, element) tuples
+    """
+    if etree is None:
+        return (
+            (event, element)
+            for event, element in ElementTree.iterparse(source, events=events)
+            if tag is None or element.tag == tag
+        )
+
+    return etree.iterparse(
+        source,
+        events=events,
+        tag=tag,
+        resolve_entities=False,
+        no_network=True,
+    )
+
+
+def parse_xml_string(source: bytes) -> Any:
+    """Parse the given serialized XML into an element.
+
+    Use lxml when it is installed, with entity resolution and network access
+    disabled; otherwise, fall back to defusedxml's ElementTree.
+
+    :param source:
+    :return: the parsed root element
+    """
+    if etree is None:
+        return ElementTree.fromstring(source)
+
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    return etree.fromstring(source, parser)
+
+
+def serialize_xml(element: Any) -> bytes:
+    """Serialize the given element, without its tail text, into XML bytes.
+
+    The result can be parsed back into an equivalent element with
+    parse_xml_string.
+
+    :param element:
+    :return: the serialized element
+    """
+    if etree is None:
+        tail: str | None = element.tail
+        element.tail = None
+
+        try:
+            return ElementTree.tostring(element)
+        finally:
+            element.tail = tail
+
+    return etree.tostring(element, with_tail=False)
+
+
+@lru_cache(maxsize=256)
 def get_namespace(tag: str) -> str:
     return tag[tag.index("{") + 1 : tag.index("}")]
 
 
-@lru_cache()
+@lru_cache(maxsize=256)
 def strip_namespace_from_tag(tag: str) -> str:
-    return tag.replace(get_namespace(tag), "").replace("{", "").replace("}", "")
+    # Interned so comparisons against tag name literals can short-circuit on
+    # identity.
+    return sys.intern(
+        tag.replace(get_namespace(tag), "").replace("{", "").replace("}", ""),
+    )
+
+
+def get_qualified_tag(namespace: str, tag: str) -> str:
+    return f"{{{namespace}}}{tag}"
 
 
-@lru_cache()
 def get_element_text_and_tail(element: Any) -> str:
     return get_element_text(element) + get_element_tail(element)
 
 
-@lru_cache()
 def get_element_text(element: Any) -> str:
     return element.text.replace("\n", " ") if element.text else ""
 
 
-@lru_cache()
 def get_element_tail(element: Any) -> str:
     return element.tail.replace("\n", " ") if element.tail else ""
 
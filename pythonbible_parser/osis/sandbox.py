@@ -1,43 +1,26 @@
 from __future__ import annotations
 
+import mmap
+import re
 from logging import info
 from pathlib import Path
 
-number_of_characters: int = 0
-tags: set[str] = set()
-current_tag: str = ""
-in_tag: bool = False
+TAG_PATTERN: re.Pattern[bytes] = re.compile(rb"<([A-Za-z][\w:-]*)")
 
-file_path = Path("versions" / "asv.xml")
+file_path = Path("versions") / "asv.xml"
 
-with file_path.open(encoding="utf-8") as reader:
-    while True:
-        character: str = reader.read(1)
+with file_path.open(mode="rb") as reader, mmap.mmap(
+    reader.fileno(),
+    0,
+    access=mmap.ACCESS_READ,
+) as contents:
+    tags: set[str] = {
+        match.group(1).decode("utf-8") for match in TAG_PATTERN.finditer(contents)
+    }
+    number_of_characters: int = len(contents)
 
-        if not character:
-            if current_tag:
-                tags.add(current_tag)
-                current_tag = ""
-                in_tag = False
-            break
+info("Total number of characters = %s", str(number_of_characters))
 
-        if current_tag and (not character.strip() or character in {">", "/"}):
-            tags.add(current_tag)
-            current_tag = ""
-            in_tag = False
-            continue
-
-        if character == "<":
-            in_tag = True
-            continue
-
-        if in_tag and character != "/":
-            current_tag += character
-
-        number_of_characters += 1
-
-    info("Total number of characters = %s", str(number_of_characters))
-
-    sorted_tags = sorted(tags)
-    for tag in sorted_tags:
-        info(tag)
+sorted_tags = sorted(tags)
+for tag in sorted_tags:
+    info(tag)
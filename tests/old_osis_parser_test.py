@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import time
 from typing import TYPE_CHECKING
+from typing import Any
 
 import pytest
 import pythonbible as bible
 
+from pythonbible_parser.osis import old_osis_parser
+from pythonbible_parser.osis import osis_utilities
+from pythonbible_parser.osis.old_osis_parser import XML_FOLDER
 from pythonbible_parser.osis.old_osis_parser import OldOSISParser
+from pythonbible_parser.osis.old_osis_parser import clean_paragraph
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from pythonbible_parser.bible_parser import BibleParser
 
 DEFAULT_PARSER = OldOSISParser(bible.Version.KING_JAMES)
@@ -288,3 +295,141 @@ def test_verse_text_caching() -> None:
     # time
     assert first_time * 0.1 > second_time
     assert first_verses == second_verses
+
+
+def test_clean_paragraph() -> None:
+    # Given a paragraph with pilcrows and runs of whitespace
+    paragraph: str = " ¶ In the   beginning\n God  created "
+
+    # When we clean the paragraph
+    # Then the pilcrows are removed and the whitespace is collapsed.
+    assert clean_paragraph(paragraph) == "In the beginning God created"
+
+
+GENESIS_50_26_KJV: str = (
+    "26. So Joseph died, being an hundred and ten years old: and they embalmed "
+    "him, and he was put in a coffin in Egypt."
+)
+EXODUS_1_1_KJV: str = (
+    "1. Now these are the names of the children of Israel, which came into "
+    "Egypt; every man and his household came with Jacob."
+)
+
+
+def _count_calls(
+    monkeypatch: pytest.MonkeyPatch,
+    module: Any,
+    function_name: str,
+) -> list[int]:
+    # Wrap the given module function so the test can see how often it is called.
+    function: Any = getattr(module, function_name)
+    calls: list[int] = []
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        calls.append(1)
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(module, function_name, wrapper)
+    return calls
+
+
+def test_books_loaded_across_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Given a new parser
+    parser: BibleParser = OldOSISParser(bible.Version.KING_JAMES)
+    streams: list[int] = _count_calls(monkeypatch, old_osis_parser, "iterparse_xml")
+
+    # When we get verses from different books in separate calls
+    genesis_text: str = parser.verse_text(1050026)
+    exodus_text: str = parser.verse_text(2001001)
+    revelation_title: str = parser.get_short_book_title(bible.Book.REVELATION)
+
+    # Then the verse text and titles are correct, and the XML file is only
+    # streamed through once.
+    assert genesis_text == GENESIS_50_26_KJV
+    assert exodus_text == EXODUS_1_1_KJV
+    assert revelation_title == "Revelation"
+    assert len(streams) == 1
+
+
+def test_get_book_title_does_not_index_book(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Given a new parser
+    parser: BibleParser = OldOSISParser(bible.Version.KING_JAMES)
+    indexes: list[int] = _count_calls(
+        monkeypatch,
+        old_osis_parser,
+        "_get_verse_index",
+    )
+
+    # When we get the title of a book
+    book_title: str = parser.get_book_title(bible.Book.EXODUS)
+
+    # Then the title is correct, and no book is loaded and indexed to get it.
+    assert book_title == "The Second Book of Moses, called Exodus"
+    assert not indexes
+
+
+def test_get_scripture_passage_text_loaded_and_unloaded_books() -> None:
+    # Given a parser that has only loaded Genesis
+    parser: BibleParser = OldOSISParser(bible.Version.KING_JAMES)
+    parser.verse_text(1050026)
+
+    # When we get a passage that spans Genesis and Exodus
+    passage: dict[
+        bible.Book,
+        dict[int, list[str]],
+    ] = parser.get_scripture_passage_text([1050026, 2001001])
+
+    # Then the passage includes the text from both books.
+    assert passage == {
+        bible.Book.GENESIS: {50: [GENESIS_50_26_KJV]},
+        bible.Book.EXODUS: {1: [EXODUS_1_1_KJV]},
+    }
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_iterparse_xml_tag_filter(
+    monkeypatch: pytest.MonkeyPatch,
+    use_lxml: bool,
+) -> None:
+    # Given that lxml is or is not available
+    if use_lxml and osis_utilities.etree is None:
+        pytest.skip("lxml is not installed")
+
+    if not use_lxml:
+        monkeypatch.setattr(osis_utilities, "etree", None)
+
+    # When we incrementally parse an XML file, filtering on the div tag
+    div_tag: str = osis_utilities.get_qualified_tag(
+        "http://www.bibletechnologies.net/2003/OSIS/namespace",
+        "div",
+    )
+
+    with (XML_FOLDER / "kjv.xml").open(mode="rb") as xml_file:
+        elements: Iterator[tuple[str, Any]] = osis_utilities.iterparse_xml(
+            xml_file,
+            tag=div_tag,
+        )
+        tags: set[str] = {element.tag for _, element in elements}
+
+    # Then only div elements are included.
+    assert tags == {div_tag}
+
+
+def test_books_loaded_without_lxml(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Given a new parser, when lxml is not available
+    monkeypatch.setattr(osis_utilities, "etree", None)
+    parser: BibleParser = OldOSISParser(bible.Version.KING_JAMES)
+
+    # When we get a title and a passage that spans two books
+    book_title: str = parser.get_short_book_title(bible.Book.EXODUS)
+    passage: dict[
+        bible.Book,
+        dict[int, list[str]],
+    ] = parser.get_scripture_passage_text([1050026, 2001001])
+
+    # Then the title and passage are correct.
+    assert book_title == "Exodus"
+    assert passage == {
+        bible.Book.GENESIS: {50: [GENESIS_50_26_KJV]},
+        bible.Book.EXODUS: {1: [EXODUS_1_1_KJV]},
+    }